@@ -3,20 +3,217 @@ Flask Web Application for Stock Analysis
 Provides a beautiful web interface for analyzing stocks
 """
 
+import os
+
+# Every route mostly waits on Yahoo, so production runs under gunicorn's
+# gevent worker. With USE_GEVENT=1 blocking sockets are patched before
+# requests/yfinance are imported, which also covers `gunicorn --preload`.
+if os.environ.get('USE_GEVENT') == '1':
+    from gevent import monkey
+    monkey.patch_all()
+
 from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from stock_analyzer import StockAnalyzer
-import plotly.graph_objs as go
-import plotly.utils
-import json
-import pandas as pd
+import orjson
+import base64
+import numpy as np
 from datetime import datetime, timedelta
-import yfinance as yf
-import os
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from cachetools import TTLCache
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# plotly and yfinance are imported inside the functions that use them, so
+# pages that never touch Yahoo or charts don't pay for loading them
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which also encodes numpy values natively"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
+app.json = OrjsonProvider(app)
+
+# Quotes move at most about once a minute, so whole responses are cached.
+# SimpleCache is per-process; set CACHE_TYPE=RedisCache (with REDIS_URL)
+# to share the cache between workers.
+app.config.from_mapping(
+    CACHE_TYPE=os.environ.get('CACHE_TYPE', 'SimpleCache'),
+    CACHE_REDIS_URL=os.environ.get('REDIS_URL'),
+    CACHE_DEFAULT_TIMEOUT=60
+)
+cache = Cache(app)
+
+# One keep-alive session for every Yahoo call, so TLS and DNS setup is paid
+# once per connection instead of once per request. yfinance releases built
+# on curl_cffi already share such a session internally, with the browser
+# impersonation that keeps Yahoo from rate-limiting (some of them reject a
+# plain requests.Session outright), so they get session=None. Older
+# installs without curl_cffi get a pooled requests.Session sized for the
+# concurrent lookups below.
+try:
+    import curl_cffi  # noqa: F401
+    _YF_SESSION = None
+except ImportError:
+    _YF_SESSION = requests.Session()
+    _YF_SESSION.headers['User-Agent'] = 'Mozilla/5.0'
+    _YF_SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
+
+# Price history is also kept on disk so restarted workers start warm
+analyzer = StockAnalyzer(session=_YF_SESSION,
+                         cache_dir=os.environ.get('STOCK_CACHE_DIR', 'cache'))
+
+# Symbols shown on the dashboard
+POPULAR_SYMBOLS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
+
+# Every yf.Ticker(...).info is a blocking round-trip to Yahoo, so the .info
+# payloads are shared across requests for a few minutes
+_info_cache = TTLCache(maxsize=2048, ttl=300)
+_info_cache_lock = threading.Lock()
+
+def _get_ticker(symbol):
+    """Return a new yf.Ticker for the given symbol"""
+    # Tickers keep their first .info and price frames for good, so they are
+    # not reused; expiry is handled by the caches around them
+    import yfinance as yf
+    return yf.Ticker(symbol, session=_YF_SESSION)
+
+def _get_info(symbol):
+    """Return Yahoo's .info dict for a symbol, cached for 5 minutes"""
+    with _info_cache_lock:
+        info = _info_cache.get(symbol)
+    if info is None:
+        info = _get_ticker(symbol).info
+        with _info_cache_lock:
+            _info_cache[symbol] = info
+    return info
+
+# Stock pages get their own pool so their fetches never queue behind
+# other requests. PAGE_FETCH_TIMEOUT bounds a fetch once it is running;
+# time spent waiting for a free worker in a burst doesn't count against it
+_page_executor = ThreadPoolExecutor(max_workers=32)
+PAGE_FETCH_TIMEOUT = 20
+
+def _page_submit(fn, *args):
+    """Submit a stock page fetch, recording when it starts running"""
+    started = threading.Event()
+    
+    def run():
+        started.set()
+        return fn(*args)
+    
+    future = _page_executor.submit(run)
+    future.add_done_callback(lambda _: started.set())  # also covers cancel()
+    future.started = started
+    return future
+
+def _page_wait(future):
+    """Result of a page fetch, allowing PAGE_FETCH_TIMEOUT from when it started"""
+    future.started.wait()
+    return future.result(timeout=PAGE_FETCH_TIMEOUT)
+
+def _page_result(future, symbol):
+    """Wait for a stock page's history fetch, as the (data, error) pair"""
+    try:
+        return _page_wait(future)
+    except FuturesTimeoutError:
+        return None, f"Timed out fetching data for {symbol}"
+
+def _resolve_listing(symbol):
+    """Find the first exchange listing of a symbol with one batched download"""
+    import yfinance as yf
+    candidates = [symbol.upper() + suffix for suffix in ['.NS', '.BO', '.L', '.TO', '.AX', '.HK', '.SS', '.SZ']]
+    try:
+        prices = yf.download(candidates, period='1d', group_by='ticker', threads=True,
+                             progress=False, session=_YF_SESSION)
+    except Exception as e:
+        print(f"Listing lookup error for {symbol}: {e}")
+        return None
+    
+    # Suffixes are in preference order; take the first one that actually traded
+    tickers = set(prices.columns.get_level_values(0))
+    for candidate in candidates:
+        if candidate in tickers and prices[candidate]['Close'].notna().any():
+            return candidate
+    return None
+
+def _fetch_info(symbol):
+    """Return the .info dict for a symbol, or None if Yahoo doesn't know it"""
+    try:
+        info = _get_info(symbol)
+    except Exception:
+        return None
+    if info and info.get('symbol') and info['symbol'] not in ('N/A', 'None'):
+        return info
+    return None
+
+def _probe_symbols(symbols, timeout=3):
+    """Fetch .info for several symbols concurrently, keyed by the symbol probed"""
+    # Each search gets its own pool, so its deadline starts when its probes
+    # do and overlapping searches can't use up each other's time budget
+    pool = ThreadPoolExecutor(max_workers=max(1, min(16, len(symbols))))
+    futures = {pool.submit(_fetch_info, symbol): symbol for symbol in symbols}
+    found = {}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            info = future.result()
+            if info:
+                found[futures[future]] = info
+    except FuturesTimeoutError:
+        print(f"Symbol probe timed out after {timeout}s, using {len(found)} results")
+    finally:
+        # Drop probes that haven't started; running ones finish on their own
+        pool.shutdown(wait=False, cancel_futures=True)
+    return found
 
-analyzer = StockAnalyzer()
+def _get_sentiment(symbol, info=None):
+    """Market sentiment for a symbol, built from the cached .info payload"""
+    try:
+        info = info or _get_info(symbol)
+    except Exception as e:
+        return {'error': f"Error fetching sentiment data: {str(e)}"}
+    return analyzer.get_market_sentiment(symbol, info=info)
+
+def _analyze_many(symbols, period):
+    """Analyze several symbols, returning {symbol: analysis} for the successful ones"""
+    # One batched download for every symbol instead of a request per ticker
+    frames = analyzer.get_stock_data_batch(symbols, period)
+    
+    analyses = {}
+    for symbol, data in frames.items():
+        try:
+            data_with_indicators = analyzer.calculate_technical_indicators(data)
+            analyses[symbol] = analyzer.analyze_from_frame(data_with_indicators, symbol)
+        except Exception as e:
+            print(f"Error analyzing {symbol}: {e}")
+    return analyses
+
+def _warmup():
+    """Fill the price history cache for the popular symbols"""
+    for period in ('1mo', '1y'):
+        try:
+            analyzer.get_stock_data_batch(POPULAR_SYMBOLS, period)
+        except Exception as e:
+            print(f"Cache warmup error ({period}): {e}")
+
+def start_warmup():
+    """Run the cold Yahoo fetches for the popular symbols in a background thread"""
+    # Called from gunicorn.conf.py and the dev server rather than at import,
+    # so CLI commands and test imports don't hit Yahoo
+    threading.Thread(target=_warmup, daemon=True).start()
 
 @app.route('/')
 def index():
@@ -40,59 +237,41 @@ def stock_detail(symbol):
     """Detailed stock analysis page - REAL-TIME VALIDATION"""
     period = request.args.get('period', '1y')
     
-    # REAL-TIME: Validate stock exists before analysis
-    try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        # Check if stock is valid
-        if not info or 'symbol' not in info or info['symbol'] == 'N/A':
-            # Try with common exchange suffixes
-            for suffix in ['.NS', '.BO', '.L', '.TO', '.AX', '.HK', '.SS', '.SZ']:
-                try:
-                    ticker = yf.Ticker(symbol + suffix)
-                    info = ticker.info
-                    if info and 'symbol' in info and info['symbol'] != 'N/A':
-                        symbol = info['symbol']  # Update symbol with correct one
-                        break
-                except:
-                    continue
-            
-            if not info or 'symbol' not in info or info['symbol'] == 'N/A':
-                return render_template('error.html', 
-                                    error_message=f"Stock '{symbol}' not found in any global market. Please check the symbol and try again.",
-                                    symbol=symbol)
-    except Exception as e:
-        print(f"Stock validation error: {e}")
+    # Start the history and sentiment fetches right away; the history
+    # result doubles as the check that the symbol is listed
+    data_future = _page_submit(analyzer.get_stock_data, symbol, period)
+    sentiment_future = _page_submit(_get_sentiment, symbol)
+    data, error = _page_result(data_future, symbol)
+    
+    # REAL-TIME: no price history for the bare symbol, so try it with
+    # common exchange suffixes (a timeout is reported as-is)
+    if data is None and data_future.done():
+        sentiment_future.cancel()
+        listing = _resolve_listing(symbol)
+        if listing is None:
+            return render_template('error.html', 
+                                error_message=f"Stock '{symbol}' not found in any global market. Please check the symbol and try again.",
+                                symbol=symbol)
+        symbol = listing  # Update symbol with correct one
+        data_future = _page_submit(analyzer.get_stock_data, symbol, period)
+        sentiment_future = _page_submit(_get_sentiment, symbol)
+        data, error = _page_result(data_future, symbol)
+    
+    if error:
+        sentiment_future.cancel()
+        return render_template('error.html', error=error, symbol=symbol)
     
-    # Get stock analysis
-    analysis = analyzer.analyze_stock(symbol, period)
-    sentiment = analyzer.get_market_sentiment(symbol)
+    try:
+        sentiment = _page_wait(sentiment_future)
+    except FuturesTimeoutError:
+        sentiment = {'error': f"Timed out fetching sentiment data for {symbol}"}
     
-    if 'error' in analysis:
-        return render_template('error.html', error=analysis['error'], symbol=symbol)
+    # Indicators are computed once and shared by the analysis and the charts
+    data_with_indicators = analyzer.calculate_technical_indicators(data)
+    analysis = analyzer.analyze_from_frame(data_with_indicators, symbol)
     
-    # Get historical data for charts
-    data, _ = analyzer.get_stock_data(symbol, period)
-    if data is not None:
-        data_with_indicators = analyzer.calculate_technical_indicators(data)
-        
-        # Create price chart
-        price_chart = create_price_chart(data_with_indicators, symbol)
-        
-        # Create RSI chart
-        rsi_chart = create_rsi_chart(data_with_indicators, symbol)
-        
-        # Create MACD chart
-        macd_chart = create_macd_chart(data_with_indicators, symbol)
-        
-        charts = {
-            'price': price_chart,
-            'rsi': rsi_chart,
-            'macd': macd_chart
-        }
-    else:
-        charts = {}
+    # Create price, RSI and MACD charts
+    charts = _get_charts(data_with_indicators, symbol, period)
     
     return render_template('stock_detail.html', 
                          analysis=analysis, 
@@ -101,6 +280,7 @@ def stock_detail(symbol):
                          symbol=symbol)
 
 @app.route('/api/stock/<symbol>')
+@cache.cached(timeout=60, query_string=True)
 def api_stock_data(symbol):
     """API endpoint for stock data"""
     period = request.args.get('period', '1y')
@@ -114,6 +294,11 @@ def search_stocks():
     if len(query) < 2:
         return jsonify([])
     
+    # FAST PATH: exact match on a known symbol is answered from memory
+    row = _BY_SYMBOL.get(query.upper())
+    if row:
+        return jsonify([row])
+    
     # PRIMARY: Real-time Yahoo Finance search (covers ALL stocks worldwide)
     try:
         yahoo_results = search_yahoo_finance_realtime(query)
@@ -126,123 +311,146 @@ def search_stocks():
     try:
         local_results = search_local_database(query.lower())
         if local_results:
-            return jsonify(local_results[:15])
+            return jsonify(local_results)
     except Exception as e:
         print(f"Local database search error: {e}")
     
     # If all else fails, return empty results
     return jsonify([])
 
+# Local stock database used as the search fallback
+STOCK_DATABASE = (
+    {'symbol': 'AAPL', 'name': 'Apple Inc.'},
+    {'symbol': 'MSFT', 'name': 'Microsoft Corporation'},
+    {'symbol': 'GOOGL', 'name': 'Alphabet Inc.'},
+    {'symbol': 'AMZN', 'name': 'Amazon.com Inc.'},
+    {'symbol': 'TSLA', 'name': 'Tesla Inc.'},
+    {'symbol': 'META', 'name': 'Meta Platforms Inc.'},
+    {'symbol': 'NVDA', 'name': 'NVIDIA Corporation'},
+    {'symbol': 'AMD', 'name': 'Advanced Micro Devices'},
+    {'symbol': 'INTC', 'name': 'Intel Corporation'},
+    {'symbol': 'CRM', 'name': 'Salesforce Inc.'},
+    {'symbol': 'ORCL', 'name': 'Oracle Corporation'},
+    {'symbol': 'ADBE', 'name': 'Adobe Inc.'},
+    {'symbol': 'PYPL', 'name': 'PayPal Holdings'},
+    {'symbol': 'SQ', 'name': 'Block Inc.'},
+    {'symbol': 'UBER', 'name': 'Uber Technologies'},
+    {'symbol': 'JPM', 'name': 'JPMorgan Chase & Co.'},
+    {'symbol': 'BAC', 'name': 'Bank of America Corp.'},
+    {'symbol': 'WMT', 'name': 'Walmart Inc.'},
+    {'symbol': 'HD', 'name': 'The Home Depot Inc.'},
+    {'symbol': 'JNJ', 'name': 'Johnson & Johnson'},
+    {'symbol': 'PG', 'name': 'Procter & Gamble Co.'},
+    {'symbol': 'UNH', 'name': 'UnitedHealth Group Inc.'},
+    {'symbol': 'MA', 'name': 'Mastercard Inc.'},
+    {'symbol': 'V', 'name': 'Visa Inc.'},
+    {'symbol': 'DIS', 'name': 'The Walt Disney Company'},
+    {'symbol': 'KO', 'name': 'The Coca-Cola Company'},
+    {'symbol': 'PEP', 'name': 'PepsiCo Inc.'},
+    {'symbol': 'ABT', 'name': 'Abbott Laboratories'},
+    {'symbol': 'TMO', 'name': 'Thermo Fisher Scientific'},
+    {'symbol': 'AVGO', 'name': 'Broadcom Inc.'},
+    {'symbol': 'QCOM', 'name': 'QUALCOMM Incorporated'},
+    {'symbol': 'TXN', 'name': 'Texas Instruments'},
+    {'symbol': 'HON', 'name': 'Honeywell International'},
+    {'symbol': 'LMT', 'name': 'Lockheed Martin Corporation'},
+    {'symbol': 'RTX', 'name': 'Raytheon Technologies'},
+    {'symbol': 'CAT', 'name': 'Caterpillar Inc.'},
+    {'symbol': 'DE', 'name': 'Deere & Company'},
+    {'symbol': 'BA', 'name': 'The Boeing Company'},
+    {'symbol': 'GE', 'name': 'General Electric Company'},
+    {'symbol': 'IBM', 'name': 'International Business Machines'},
+    {'symbol': 'CSCO', 'name': 'Cisco Systems Inc.'},
+    {'symbol': 'VZ', 'name': 'Verizon Communications'},
+    {'symbol': 'T', 'name': 'AT&T Inc.'},
+    {'symbol': 'CMCSA', 'name': 'Comcast Corporation'},
+    {'symbol': 'CHTR', 'name': 'Charter Communications'},
+    {'symbol': 'NFLX', 'name': 'Netflix Inc.'},
+    {'symbol': 'SPOT', 'name': 'Spotify Technology'},
+    {'symbol': 'ZM', 'name': 'Zoom Video Communications'},
+    {'symbol': 'SHOP', 'name': 'Shopify Inc.'},
+    {'symbol': 'ROKU', 'name': 'Roku Inc.'},
+    {'symbol': 'SNAP', 'name': 'Snap Inc.'},
+    {'symbol': 'TWTR', 'name': 'Twitter Inc.'},
+    {'symbol': 'PINS', 'name': 'Pinterest Inc.'},
+    {'symbol': 'LYFT', 'name': 'Lyft Inc.'},
+    {'symbol': 'DASH', 'name': 'DoorDash Inc.'},
+    {'symbol': 'ABNB', 'name': 'Airbnb Inc.'},
+    {'symbol': 'SNOW', 'name': 'Snowflake Inc.'},
+    {'symbol': 'PLTR', 'name': 'Palantir Technologies'},
+    {'symbol': 'COIN', 'name': 'Coinbase Global Inc.'},
+    {'symbol': 'HOOD', 'name': 'Robinhood Markets Inc.'},
+    # Indian Stocks (NSE), stored with Yahoo's .NS suffix so results link to the right listing
+    {'symbol': 'GRASIM.NS', 'name': 'Grasim Industries Ltd.'},
+    {'symbol': 'TCS.NS', 'name': 'Tata Consultancy Services Ltd.'},
+    {'symbol': 'INFY.NS', 'name': 'Infosys Ltd.'},
+    {'symbol': 'RELIANCE.NS', 'name': 'Reliance Industries Ltd.'},
+    {'symbol': 'HDFCBANK.NS', 'name': 'HDFC Bank Ltd.'},
+    {'symbol': 'ICICIBANK.NS', 'name': 'ICICI Bank Ltd.'},
+    {'symbol': 'ITC.NS', 'name': 'ITC Ltd.'},
+    {'symbol': 'SBIN.NS', 'name': 'State Bank of India'},
+    {'symbol': 'BHARTIARTL.NS', 'name': 'Bharti Airtel Ltd.'},
+    {'symbol': 'AXISBANK.NS', 'name': 'Axis Bank Ltd.'},
+    {'symbol': 'KOTAKBANK.NS', 'name': 'Kotak Mahindra Bank Ltd.'},
+    {'symbol': 'ASIANPAINT.NS', 'name': 'Asian Paints Ltd.'},
+    {'symbol': 'MARUTI.NS', 'name': 'Maruti Suzuki India Ltd.'},
+    {'symbol': 'HINDUNILVR.NS', 'name': 'Hindustan Unilever Ltd.'},
+    {'symbol': 'WIPRO.NS', 'name': 'Wipro Ltd.'},
+    {'symbol': 'TMPV.NS', 'name': 'Tata Motors Passenger Vehicles Ltd.'},
+    {'symbol': 'ULTRACEMCO.NS', 'name': 'UltraTech Cement Ltd.'},
+    {'symbol': 'SUNPHARMA.NS', 'name': 'Sun Pharmaceutical Industries Ltd.'},
+    {'symbol': 'TITAN.NS', 'name': 'Titan Company Ltd.'},
+    {'symbol': 'NESTLEIND.NS', 'name': 'Nestle India Ltd.'}
+)
+
+# Search results in their /api/search shape, built once and shared
+_ROWS = tuple(
+    {'symbol': stock['symbol'], 'name': stock['name'],
+     'display': f"{stock['symbol']} - {stock['name']}"}
+    for stock in STOCK_DATABASE
+)
+
+# Exact symbol lookups for the /api/search fast path
+_BY_SYMBOL = {row['symbol'].upper(): row for row in _ROWS}
+
+# (row, lowercased "symbol name") pairs, so verifying a candidate is a
+# single substring check on a prebuilt string
+_INDEX = tuple((row, f"{row['symbol']} {row['name']}".lower()) for row in _ROWS)
+
+def _build_prefix_index():
+    """Map every 2- and 3-character substring of a symbol or name to the rows containing it"""
+    index = defaultdict(list)
+    for entry in _INDEX:
+        keys = set()
+        for field in (entry[0]['symbol'].lower(), entry[0]['name'].lower()):
+            for n in (2, 3):
+                keys.update(field[i:i + n] for i in range(len(field) - n + 1))
+        for key in keys:
+            index[key].append(entry)
+    return index
+
+# Built once at import: a search only looks at the rows sharing the
+# query's leading 2-3 characters instead of scanning the whole database
+_PREFIX = _build_prefix_index()
+
 def search_local_database(query):
     """Search in local stock database"""
-    stock_database = [
-        {'symbol': 'AAPL', 'name': 'Apple Inc.'},
-        {'symbol': 'MSFT', 'name': 'Microsoft Corporation'},
-        {'symbol': 'GOOGL', 'name': 'Alphabet Inc.'},
-        {'symbol': 'AMZN', 'name': 'Amazon.com Inc.'},
-        {'symbol': 'TSLA', 'name': 'Tesla Inc.'},
-        {'symbol': 'META', 'name': 'Meta Platforms Inc.'},
-        {'symbol': 'NVDA', 'name': 'NVIDIA Corporation'},
-        {'symbol': 'NFLX', 'name': 'Netflix Inc.'},
-        {'symbol': 'AMD', 'name': 'Advanced Micro Devices'},
-        {'symbol': 'INTC', 'name': 'Intel Corporation'},
-        {'symbol': 'CRM', 'name': 'Salesforce Inc.'},
-        {'symbol': 'ORCL', 'name': 'Oracle Corporation'},
-        {'symbol': 'ADBE', 'name': 'Adobe Inc.'},
-        {'symbol': 'PYPL', 'name': 'PayPal Holdings'},
-        {'symbol': 'SQ', 'name': 'Block Inc.'},
-        {'symbol': 'UBER', 'name': 'Uber Technologies'},
-        {'symbol': 'JPM', 'name': 'JPMorgan Chase & Co.'},
-        {'symbol': 'BAC', 'name': 'Bank of America Corp.'},
-        {'symbol': 'WMT', 'name': 'Walmart Inc.'},
-        {'symbol': 'HD', 'name': 'The Home Depot Inc.'},
-        {'symbol': 'JNJ', 'name': 'Johnson & Johnson'},
-        {'symbol': 'PG', 'name': 'Procter & Gamble Co.'},
-        {'symbol': 'UNH', 'name': 'UnitedHealth Group Inc.'},
-        {'symbol': 'MA', 'name': 'Mastercard Inc.'},
-        {'symbol': 'V', 'name': 'Visa Inc.'},
-        {'symbol': 'DIS', 'name': 'The Walt Disney Company'},
-        {'symbol': 'KO', 'name': 'The Coca-Cola Company'},
-        {'symbol': 'PEP', 'name': 'PepsiCo Inc.'},
-        {'symbol': 'ABT', 'name': 'Abbott Laboratories'},
-        {'symbol': 'TMO', 'name': 'Thermo Fisher Scientific'},
-        {'symbol': 'AVGO', 'name': 'Broadcom Inc.'},
-        {'symbol': 'QCOM', 'name': 'QUALCOMM Incorporated'},
-        {'symbol': 'TXN', 'name': 'Texas Instruments'},
-        {'symbol': 'HON', 'name': 'Honeywell International'},
-        {'symbol': 'LMT', 'name': 'Lockheed Martin Corporation'},
-        {'symbol': 'RTX', 'name': 'Raytheon Technologies'},
-        {'symbol': 'CAT', 'name': 'Caterpillar Inc.'},
-        {'symbol': 'DE', 'name': 'Deere & Company'},
-        {'symbol': 'BA', 'name': 'The Boeing Company'},
-        {'symbol': 'GE', 'name': 'General Electric Company'},
-        {'symbol': 'IBM', 'name': 'International Business Machines'},
-        {'symbol': 'CSCO', 'name': 'Cisco Systems Inc.'},
-        {'symbol': 'VZ', 'name': 'Verizon Communications'},
-        {'symbol': 'T', 'name': 'AT&T Inc.'},
-        {'symbol': 'CMCSA', 'name': 'Comcast Corporation'},
-        {'symbol': 'CHTR', 'name': 'Charter Communications'},
-        {'symbol': 'NFLX', 'name': 'Netflix Inc.'},
-        {'symbol': 'SPOT', 'name': 'Spotify Technology'},
-        {'symbol': 'ZM', 'name': 'Zoom Video Communications'},
-        {'symbol': 'SHOP', 'name': 'Shopify Inc.'},
-        {'symbol': 'ROKU', 'name': 'Roku Inc.'},
-        {'symbol': 'SNAP', 'name': 'Snap Inc.'},
-        {'symbol': 'TWTR', 'name': 'Twitter Inc.'},
-        {'symbol': 'PINS', 'name': 'Pinterest Inc.'},
-        {'symbol': 'LYFT', 'name': 'Lyft Inc.'},
-        {'symbol': 'DASH', 'name': 'DoorDash Inc.'},
-        {'symbol': 'ABNB', 'name': 'Airbnb Inc.'},
-        {'symbol': 'SNOW', 'name': 'Snowflake Inc.'},
-        {'symbol': 'PLTR', 'name': 'Palantir Technologies'},
-        {'symbol': 'COIN', 'name': 'Coinbase Global Inc.'},
-        {'symbol': 'HOOD', 'name': 'Robinhood Markets Inc.'},
-        # Indian Stocks (NSE)
-        {'symbol': 'GRASIM', 'name': 'Grasim Industries Ltd.'},
-        {'symbol': 'TCS', 'name': 'Tata Consultancy Services Ltd.'},
-        {'symbol': 'INFY', 'name': 'Infosys Ltd.'},
-        {'symbol': 'RELIANCE', 'name': 'Reliance Industries Ltd.'},
-        {'symbol': 'HDFC', 'name': 'HDFC Bank Ltd.'},
-        {'symbol': 'ICICIBANK', 'name': 'ICICI Bank Ltd.'},
-        {'symbol': 'ITC', 'name': 'ITC Ltd.'},
-        {'symbol': 'SBIN', 'name': 'State Bank of India'},
-        {'symbol': 'BHARTIARTL', 'name': 'Bharti Airtel Ltd.'},
-        {'symbol': 'AXISBANK', 'name': 'Axis Bank Ltd.'},
-        {'symbol': 'KOTAKBANK', 'name': 'Kotak Mahindra Bank Ltd.'},
-        {'symbol': 'ASIANPAINT', 'name': 'Asian Paints Ltd.'},
-        {'symbol': 'MARUTI', 'name': 'Maruti Suzuki India Ltd.'},
-        {'symbol': 'HINDUNILVR', 'name': 'Hindustan Unilever Ltd.'},
-        {'symbol': 'WIPRO', 'name': 'Wipro Ltd.'},
-        {'symbol': 'TATAMOTORS', 'name': 'Tata Motors Ltd.'},
-        {'symbol': 'ULTRACEMCO', 'name': 'UltraTech Cement Ltd.'},
-        {'symbol': 'SUNPHARMA', 'name': 'Sun Pharmaceutical Industries Ltd.'},
-        {'symbol': 'TITAN', 'name': 'Titan Company Ltd.'},
-        {'symbol': 'NESTLEIND', 'name': 'Nestle India Ltd.'}
-    ]
+    hits = _PREFIX.get(query[:3]) or _PREFIX.get(query[:2]) or []
     
     # Search by both symbol and name
-    results = []
-    for stock in stock_database:
-        if (query in stock['symbol'].lower() or 
-            query in stock['name'].lower()):
-            results.append({
-                'symbol': stock['symbol'],
-                'name': stock['name'],
-                'display': f"{stock['symbol']} - {stock['name']}"
-            })
-    
-    return results
+    return [row for row, hay in hits if query in hay][:15]
 
 def search_yahoo_finance_realtime(query):
     """REAL-TIME GLOBAL STOCK SEARCH - Covers ALL stocks worldwide"""
     results = []
+    seen = set()  # symbols already in results
     
     # Method 1: Direct ticker search (most accurate)
     try:
-        ticker = yf.Ticker(query.upper())
-        info = ticker.info
+        info = _get_info(query.upper())
         
         if info and 'symbol' in info and info['symbol'] and info['symbol'] != 'N/A':
+            seen.add(info['symbol'])
             results.append({
                 'symbol': info['symbol'],
                 'name': info.get('longName', info.get('shortName', 'Unknown Company')),
@@ -254,8 +462,13 @@ def search_yahoo_finance_realtime(query):
     except Exception as e:
         print(f"Direct ticker search error: {e}")
     
+    # A clean US ticker matched directly, no need to probe other exchanges
+    if results and '.' not in results[0]['symbol']:
+        return results
+    
     # Method 2: Multi-exchange search (covers global markets)
-    exchanges = [
+    # dict.fromkeys keeps the order while guarding against repeated suffixes
+    exchanges = list(dict.fromkeys([
         '',      # US markets
         '.NS',   # India NSE
         '.BO',   # India BSE
@@ -283,38 +496,29 @@ def search_yahoo_finance_realtime(query):
         '.BD',   # Budapest
         '.RG',   # Riga
         '.TL',   # Tallinn
-        '.VS',   # Vilnius
-        '.RG',   # Riga
-        '.WA',   # Warsaw
-        '.RG',   # Riga
-        '.TL',   # Tallinn
         '.VS'    # Vilnius
-    ]
+    ]))
+    
+    # Probe every exchange at once; results are still ranked in exchange order
+    found = _probe_symbols([query.upper() + exchange for exchange in exchanges])
     
     for exchange in exchanges:
         if len(results) >= 20:  # Limit results
             break
-            
-        try:
-            ticker_symbol = query.upper() + exchange
-            ticker = yf.Ticker(ticker_symbol)
-            info = ticker.info
-            
-            if (info and 'symbol' in info and info['symbol'] and 
-                info['symbol'] != 'N/A' and info['symbol'] != 'None'):
-                
-                # Avoid duplicates
-                if not any(r['symbol'] == info['symbol'] for r in results):
-                    results.append({
-                        'symbol': info['symbol'],
-                        'name': info.get('longName', info.get('shortName', 'Unknown Company')),
-                        'display': f"{info['symbol']} - {info.get('longName', info.get('shortName', 'Unknown Company'))}",
-                        'source': 'yahoo_realtime',
-                        'exchange': info.get('exchange', exchange),
-                        'country': info.get('country', 'Unknown')
-                    })
-        except Exception as e:
-            continue
+        
+        info = found.get(query.upper() + exchange)
+        if info:
+            # Avoid duplicates
+            if info['symbol'] not in seen:
+                seen.add(info['symbol'])
+                results.append({
+                    'symbol': info['symbol'],
+                    'name': info.get('longName', info.get('shortName', 'Unknown Company')),
+                    'display': f"{info['symbol']} - {info.get('longName', info.get('shortName', 'Unknown Company'))}",
+                    'source': 'yahoo_realtime',
+                    'exchange': info.get('exchange', exchange),
+                    'country': info.get('country', 'Unknown')
+                })
     
     # Method 3: Fuzzy search for company names
     if len(results) < 5 and len(query) > 3:
@@ -330,13 +534,13 @@ def search_yahoo_finance_realtime(query):
                 if len(results) >= 20:
                     break
                     
-                ticker = yf.Ticker(variation)
-                info = ticker.info
+                info = _get_info(variation)
                 
                 if (info and 'symbol' in info and info['symbol'] and 
                     info['symbol'] != 'N/A' and info['symbol'] != 'None'):
                     
-                    if not any(r['symbol'] == info['symbol'] for r in results):
+                    if info['symbol'] not in seen:
+                        seen.add(info['symbol'])
                         results.append({
                             'symbol': info['symbol'],
                             'name': info.get('longName', info.get('shortName', 'Unknown Company')),
@@ -351,6 +555,7 @@ def search_yahoo_finance_realtime(query):
     return results
 
 @app.route('/api/market-overview')
+@cache.cached(timeout=60, query_string=True)
 def api_market_overview():
     """API endpoint for market overview data - GLOBAL COVERAGE"""
     # Global market symbols (US, India, Europe, Asia)
@@ -368,7 +573,7 @@ def api_market_overview():
         {'symbol': 'TCS.NS', 'name': 'TCS', 'market': 'India'},
         {'symbol': 'RELIANCE.NS', 'name': 'Reliance', 'market': 'India'},
         {'symbol': 'INFY.NS', 'name': 'Infosys', 'market': 'India'},
-        {'symbol': 'HDFC.NS', 'name': 'HDFC Bank', 'market': 'India'},
+        {'symbol': 'HDFCBANK.NS', 'name': 'HDFC Bank', 'market': 'India'},
         {'symbol': 'ICICIBANK.NS', 'name': 'ICICI Bank', 'market': 'India'},
         
         # European Markets
@@ -383,27 +588,25 @@ def api_market_overview():
     ]
     
     market_data = []
+    analyses = _analyze_many([stock['symbol'] for stock in global_symbols], '1mo')
     
     for stock in global_symbols:
-        try:
-            analysis = analyzer.analyze_stock(stock['symbol'], '1mo')
-            if 'error' not in analysis:
-                market_data.append({
-                    'symbol': analysis['symbol'],
-                    'name': stock['name'],
-                    'market': stock['market'],
-                    'price': analysis['current_price'],
-                    'change': analysis['price_change_pct'],
-                    'recommendation': analysis['recommendation'],
-                    'signal_strength': analysis['signal_strength']
-                })
-        except Exception as e:
-            print(f"Error analyzing {stock['symbol']}: {e}")
-            continue
+        analysis = analyses.get(stock['symbol'])
+        if analysis:
+            market_data.append({
+                'symbol': analysis['symbol'],
+                'name': stock['name'],
+                'market': stock['market'],
+                'price': analysis['current_price'],
+                'change': analysis['price_change_pct'],
+                'recommendation': analysis['recommendation'],
+                'signal_strength': analysis['signal_strength']
+            })
     
     return jsonify(market_data)
 
 @app.route('/api/global-markets')
+@cache.cached(timeout=3600, query_string=True)
 def api_global_markets():
     """API endpoint for global market status and coverage"""
     markets = {
@@ -459,147 +662,160 @@ def contact():
     return render_template('contact.html')
 
 @app.route('/dashboard')
+@cache.cached(timeout=60, query_string=True)
 def dashboard():
     """Market overview dashboard"""
     # Get analysis for popular stocks
-    popular_symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
-    market_overview = []
-    
-    for symbol in popular_symbols:
-        try:
-            analysis = analyzer.analyze_stock(symbol, '1mo')
-            if 'error' not in analysis:
-                market_overview.append(analysis)
-        except:
-            continue
+    market_overview = list(_analyze_many(POPULAR_SYMBOLS, '1mo').values())
     
     return render_template('dashboard.html', market_overview=market_overview)
 
-def create_price_chart(data, symbol):
+# Columns the charts read, pulled out of the DataFrame once per page
+CHART_COLUMNS = ('Open', 'High', 'Low', 'Close', 'SMA_20', 'SMA_50',
+                 'BB_Upper', 'BB_Lower', 'RSI', 'MACD', 'MACD_Signal')
+
+# Charts are emitted as plain Plotly JSON (trace and layout dicts) and
+# serialized by orjson, so no Figure objects are built per request. The
+# layouts only differ by title between requests, so each one is built
+# here and serialized once, template included, by _layout_json.
+def _hline(y, dash, color):
+    """Horizontal line across the full plot width, as Figure.add_hline draws it"""
+    return {'type': 'line', 'xref': 'x domain', 'x0': 0, 'x1': 1,
+            'yref': 'y', 'y0': y, 'y1': y, 'line': {'color': color, 'dash': dash}}
+
+def _hline_label(y, text):
+    """Right-aligned label sitting on top of an _hline"""
+    return {'text': text, 'showarrow': False, 'xref': 'x domain', 'x': 1,
+            'xanchor': 'right', 'yref': 'y', 'y': y, 'yanchor': 'bottom'}
+
+_BASE_LAYOUT = {'xaxis': {'title': {'text': 'Date'}, 'type': 'date'}}
+_PRICE_LAYOUT = dict(_BASE_LAYOUT, yaxis={'title': {'text': 'Price ($)'}}, height=500)
+_RSI_LAYOUT = dict(
+    _BASE_LAYOUT,
+    yaxis={'title': {'text': 'RSI'}, 'range': [0, 100]},
+    height=300,
+    # Overbought/oversold lines
+    shapes=[_hline(70, 'dash', 'red'), _hline(30, 'dash', 'green'), _hline(50, 'dot', 'gray')],
+    annotations=[_hline_label(70, 'Overbought'), _hline_label(30, 'Oversold')]
+)
+_MACD_LAYOUT = dict(_BASE_LAYOUT, yaxis={'title': {'text': 'MACD'}}, height=300)
+_LAYOUTS = {'price': _PRICE_LAYOUT, 'rsi': _RSI_LAYOUT, 'macd': _MACD_LAYOUT}
+
+@lru_cache(maxsize=None)
+def _layout_json(kind):
+    """A chart layout with the plotly_white template expanded, as a JSON string"""
+    import plotly.io as pio
+    template = pio.templates['plotly_white'].to_plotly_json()
+    return orjson.dumps(dict(_LAYOUTS[kind], template=template)).decode()
+
+def _chart_dates(data):
+    """Return the DataFrame index as naive epoch milliseconds for a Plotly date axis"""
+    index = data.index
+    if getattr(index, 'tz', None) is not None:
+        # Plotly draws wall-clock times anyway, so drop the zone first
+        index = index.tz_localize(None)
+    return index.to_numpy().astype('datetime64[ms]').astype('float64')
+
+def _typed_array(values):
+    """Encode a float array as a Plotly typed array (base64 'bdata')"""
+    # Little-endian binary is a fraction of the size of JSON number text
+    # and Plotly.js decodes it straight into a Float32/Float64Array
+    dtype = 'f4' if values.dtype == np.float32 else 'f8'
+    data = np.ascontiguousarray(values, dtype='<' + dtype).tobytes()
+    return {'dtype': dtype, 'bdata': base64.b64encode(data).decode('ascii')}
+
+def _chart_json(traces, kind, title):
+    """Serialize the traces with orjson and splice in the title and cached layout"""
+    # The title goes first in the layout object, followed by the rest of
+    # the pre-serialized layout after its opening brace
+    return '{"data":%s,"layout":{"title":{"text":%s},%s}' % (
+        orjson.dumps(traces).decode(), orjson.dumps(title).decode(), _layout_json(kind)[1:])
+
+# Chart JSON for recently rendered pages. The key includes the last bar's
+# timestamp and close, so a new or updated bar builds fresh charts
+_chart_cache = TTLCache(maxsize=256, ttl=300)
+_chart_cache_lock = threading.Lock()
+
+def _get_charts(data, symbol, period):
+    """Return build_all_charts output, reusing it while the data is unchanged"""
+    key = (symbol, period, data.index[-1], float(data['Close'].iloc[-1]))
+    with _chart_cache_lock:
+        charts = _chart_cache.get(key)
+    if charts is None:
+        charts = build_all_charts(data, symbol)
+        with _chart_cache_lock:
+            _chart_cache[key] = charts
+    return charts
+
+def build_all_charts(data, symbol):
+    """Build the price, RSI and MACD charts from a single pass over the data"""
+    x = _typed_array(_chart_dates(data))
+    # float32 keeps ~7 significant digits, plenty for a chart, and halves
+    # the bytes the browser has to download
+    cols = {column: data[column].to_numpy(dtype='float32') for column in CHART_COLUMNS}
+    cols['MACD_Hist'] = cols['MACD'] - cols['MACD_Signal']
+    cols = {column: _typed_array(values) for column, values in cols.items()}
+    
+    return {
+        'price': create_price_chart(x, cols, symbol),
+        'rsi': create_rsi_chart(x, cols, symbol),
+        'macd': create_macd_chart(x, cols, symbol)
+    }
+
+def _line(x, y, name, color, width=2, **extra):
+    """Scatter trace drawn as a line"""
+    return dict(type='scatter', mode='lines', x=x, y=y, name=name,
+                line=dict(color=color, width=width, **extra))
+
+def create_price_chart(x, cols, symbol):
     """Create interactive price chart with technical indicators"""
-    fig = go.Figure()
-    
-    # Candlestick chart
-    fig.add_trace(go.Candlestick(
-        x=data.index,
-        open=data['Open'],
-        high=data['High'],
-        low=data['Low'],
-        close=data['Close'],
-        name='Price',
-        increasing_line_color='#26A69A',
-        decreasing_line_color='#EF5350'
-    ))
-    
-    # Moving averages
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['SMA_20'],
-        mode='lines',
-        name='SMA 20',
-        line=dict(color='#FF9800', width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['SMA_50'],
-        mode='lines',
-        name='SMA 50',
-        line=dict(color='#2196F3', width=2)
-    ))
-    
-    # Bollinger Bands
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['BB_Upper'],
-        mode='lines',
-        name='BB Upper',
-        line=dict(color='#9E9E9E', width=1, dash='dash')
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['BB_Lower'],
-        mode='lines',
-        name='BB Lower',
-        line=dict(color='#9E9E9E', width=1, dash='dash'),
-        fill='tonexty'
-    ))
-    
-    fig.update_layout(
-        title=f'{symbol} Stock Price',
-        xaxis_title='Date',
-        yaxis_title='Price ($)',
-        template='plotly_white',
-        height=500
-    )
-    
-    return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-
-def create_rsi_chart(data, symbol):
-    """Create RSI chart"""
-    fig = go.Figure()
+    traces = [
+        # Candlestick chart
+        dict(
+            type='candlestick',
+            x=x,
+            open=cols['Open'],
+            high=cols['High'],
+            low=cols['Low'],
+            close=cols['Close'],
+            name='Price',
+            increasing=dict(line=dict(color='#26A69A')),
+            decreasing=dict(line=dict(color='#EF5350'))
+        ),
+        
+        # Moving averages
+        _line(x, cols['SMA_20'], 'SMA 20', '#FF9800'),
+        _line(x, cols['SMA_50'], 'SMA 50', '#2196F3'),
+        
+        # Bollinger Bands
+        _line(x, cols['BB_Upper'], 'BB Upper', '#9E9E9E', width=1, dash='dash'),
+        dict(_line(x, cols['BB_Lower'], 'BB Lower', '#9E9E9E', width=1, dash='dash'),
+             fill='tonexty')
+    ]
     
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['RSI'],
-        mode='lines',
-        name='RSI',
-        line=dict(color='#9C27B0', width=2)
-    ))
+    return _chart_json(traces, 'price', f'{symbol} Stock Price')
+
+def create_rsi_chart(x, cols, symbol):
+    """Create RSI chart"""
+    traces = [_line(x, cols['RSI'], 'RSI', '#9C27B0')]
     
-    # Overbought/oversold lines
-    fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
-    fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
-    fig.add_hline(y=50, line_dash="dot", line_color="gray")
-    
-    fig.update_layout(
-        title=f'{symbol} RSI (14)',
-        xaxis_title='Date',
-        yaxis_title='RSI',
-        template='plotly_white',
-        height=300,
-        yaxis=dict(range=[0, 100])
-    )
-    
-    return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-
-def create_macd_chart(data, symbol):
+    return _chart_json(traces, 'rsi', f'{symbol} RSI (14)')
+
+def create_macd_chart(x, cols, symbol):
     """Create MACD chart"""
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['MACD'],
-        mode='lines',
-        name='MACD',
-        line=dict(color='#2196F3', width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data['MACD_Signal'],
-        mode='lines',
-        name='Signal',
-        line=dict(color='#FF9800', width=2)
-    ))
-    
-    fig.add_trace(go.Bar(
-        x=data.index,
-        y=data['MACD'] - data['MACD_Signal'],
-        name='Histogram',
-        marker_color='#4CAF50'
-    ))
-    
-    fig.update_layout(
-        title=f'{symbol} MACD',
-        xaxis_title='Date',
-        yaxis_title='MACD',
-        template='plotly_white',
-        height=300
-    )
-    
-    return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    traces = [
+        _line(x, cols['MACD'], 'MACD', '#2196F3'),
+        _line(x, cols['MACD_Signal'], 'Signal', '#FF9800'),
+        dict(
+            type='bar',
+            x=x,
+            y=cols['MACD_Hist'],
+            name='Histogram',
+            marker=dict(color='#4CAF50')
+        )
+    ]
+    
+    return _chart_json(traces, 'macd', f'{symbol} MACD')
 
 @app.errorhandler(404)
 def not_found(error):
@@ -610,5 +826,7 @@ def internal_error(error):
     return render_template('500.html'), 500
 
 if __name__ == '__main__':
+    # Development server only; see the Procfile for the gevent/gunicorn setup
     port = int(os.environ.get('PORT', 5000))
+    start_warmup()
     app.run(host='0.0.0.0', port=port, debug=False) 
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Gunicorn settings picked up automatically from the project root
+"""
+
+def post_worker_init(worker):
+    """Warm the price history cache from the first worker only"""
+    # The history lands in the shared on-disk cache, so the other workers
+    # read it from there instead of repeating the same downloads at boot
+    if worker.age == 1:
+        from app import start_warmup
+        start_warmup()
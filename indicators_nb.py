@@ -0,0 +1,78 @@
+"""
+Numba-compiled indicator kernels
+Moving averages, volatility and RSI loops used by the analysis engine
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernels below also run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Each kernel matches the output of the equivalent `ta` indicator,
+# including the leading NaNs until a full window has been seen.
+
+@njit(cache=True)
+def sma_nb(values, window):
+    """Simple moving average over a fixed window"""
+    n = len(values)
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += values[j]
+        out[i] = total / window
+    return out
+
+@njit(cache=True)
+def rolling_std_nb(values, window):
+    """Population standard deviation over a fixed window"""
+    n = len(values)
+    mean = sma_nb(values, window)
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            diff = values[j] - mean[i]
+            total += diff * diff
+        out[i] = np.sqrt(total / window)
+    return out
+
+@njit(cache=True)
+def ema_nb(values, window):
+    """Exponential moving average (span=window), starting at the first valid value"""
+    n = len(values)
+    alpha = 2.0 / (window + 1)
+    out = np.full(n, np.nan)
+    ema = np.nan
+    count = 0
+    for i in range(n):
+        value = values[i]
+        if not np.isnan(value):
+            ema = value if count == 0 else (1 - alpha) * ema + alpha * value
+            count += 1
+        if count >= window:
+            out[i] = ema
+    return out
+
+@njit(cache=True)
+def rsi_nb(close, window=14):
+    """Relative Strength Index with Wilder smoothing"""
+    n = len(close)
+    alpha = 1.0 / window
+    out = np.full(n, np.nan)
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        change = close[i] - close[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        avg_gain = (1 - alpha) * avg_gain + alpha * gain
+        avg_loss = (1 - alpha) * avg_loss + alpha * loss
+        if i >= window - 1:
+            out[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1 + avg_gain / avg_loss)
+    return out
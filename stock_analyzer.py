@@ -3,93 +3,224 @@ Stock Analysis Engine
 Provides technical analysis, market sentiment, and buy/sell recommendations
 """
 
-import yfinance as yf
-import pandas as pd
 import numpy as np
-import ta
+import diskcache
+from cachetools import TTLCache
 from datetime import datetime, timedelta
+from functools import wraps
+from collections import Counter
+import threading
 import warnings
+from indicators_nb import sma_nb, rolling_std_nb, ema_nb, rsi_nb
 warnings.filterwarnings('ignore')
 
+def _precompute(close):
+    """Return (returns, max_drawdown, running_max) for the close prices"""
+    # Returns skip NaNs like pct_change().dropna(); max_drawdown is the
+    # largest drop from the running high, as a (negative) fraction
+    close = np.asarray(close, dtype=np.float64)
+    returns = np.diff(close) / close[:-1]
+    running_max = np.fmax.accumulate(close)
+    max_drawdown = np.nanmin(close / running_max - 1)
+    return returns[~np.isnan(returns)], max_drawdown, running_max
+
+# Results of the Yahoo-backed methods, shared by every StockAnalyzer so a
+# popular ticker requested by several pages is only fetched once per window
+_result_cache = TTLCache(maxsize=512, ttl=300)
+_result_cache_lock = threading.Lock()
+
+def _history_expire(data, ttl):
+    """Disk expiry for a price frame, ending before the next session could add a bar"""
+    # Exchange hours aren't known here, so any weekday counts as a day a
+    # session may be open or about to open: those frames get the memory TTL.
+    # Over a weekend the long TTL is capped at the start of Monday.
+    now = datetime.now(data.index[-1].tzinfo)
+    if now.weekday() < 5:
+        return _result_cache.ttl
+    monday = (now + timedelta(days=7 - now.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    return min(ttl, (monday - now).total_seconds())
+
+def _is_success(result):
+    """False for the (None, error) and {'error': ...} results used for failures"""
+    if isinstance(result, tuple):
+        result = result[0]
+    return result is not None and not (isinstance(result, dict) and 'error' in result)
+
+def _ttl_cached(make_key):
+    """Cache a method's successful results in _result_cache under make_key(*args)"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = make_key(*args, **kwargs)
+            with _result_cache_lock:
+                if key in _result_cache:
+                    return _result_cache[key]
+            result = method(self, *args, **kwargs)
+            if _is_success(result):
+                with _result_cache_lock:
+                    _result_cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
 class StockAnalyzer:
-    def __init__(self):
+    def __init__(self, session=None, cache_dir=None, cache_ttl=3600):
         self.risk_free_rate = 0.02  # 2% risk-free rate
+        self.session = session  # optional HTTP session shared by yfinance calls
+        # Optional on-disk price history cache, kept across restarts
+        self.cache = diskcache.Cache(cache_dir) if cache_dir else None
+        self.cache_ttl = cache_ttl
         
+    def _cached_history(self, symbol, period):
+        """Price history from the in-memory or on-disk cache, or None"""
+        with _result_cache_lock:
+            hit = _result_cache.get(f"history:{symbol}:{period}")
+        if hit is not None:
+            return hit[0]
+        if self.cache is not None:
+            return self.cache.get(('history', symbol, period))
+        return None
+    
+    def _store_history(self, symbol, period, data):
+        """Put freshly fetched price history into both caches"""
+        with _result_cache_lock:
+            _result_cache[f"history:{symbol}:{period}"] = (data, None)
+        if self.cache is not None:
+            # Rolling period= windows gain a bar every session, so the disk
+            # copy must not outlive the point where a new one can appear
+            expire = _history_expire(data, self.cache_ttl)
+            self.cache.set(('history', symbol, period), data, expire=expire)
+    
     def get_stock_data(self, symbol, period="1y"):
         """Fetch stock data from Yahoo Finance"""
+        data = self._cached_history(symbol, period)
+        if data is not None:
+            return data, None
+        
         try:
-            stock = yf.Ticker(symbol)
+            import yfinance as yf
+            stock = yf.Ticker(symbol, session=self.session)
             data = stock.history(period=period)
             if data.empty:
                 return None, f"No data found for {symbol}"
+            self._store_history(symbol, period, data)
             return data, None
         except Exception as e:
             return None, f"Error fetching data for {symbol}: {str(e)}"
     
+    def get_stock_data_batch(self, symbols, period="1y"):
+        """Fetch several symbols with batched Yahoo requests, returning {symbol: data}"""
+        frames = {}
+        missing = []
+        for symbol in symbols:
+            data = self._cached_history(symbol, period)
+            if data is not None:
+                frames[symbol] = data
+            else:
+                missing.append(symbol)
+        
+        # Yahoo accepts up to 20 tickers per download
+        for start in range(0, len(missing), 20):
+            batch = missing[start:start + 20]
+            try:
+                import yfinance as yf
+                prices = yf.download(tickers=" ".join(batch), period=period, group_by='ticker',
+                                     auto_adjust=True, threads=True, progress=False,
+                                     session=self.session)
+            except Exception as e:
+                print(f"Batch download error for {batch}: {e}")
+                continue
+            
+            tickers = set(prices.columns.get_level_values(0)) if prices.columns.nlevels > 1 else set()
+            for symbol in batch:
+                if symbol in tickers:
+                    data = prices[symbol].dropna(how='all')
+                elif prices.columns.nlevels == 1 and len(batch) == 1:
+                    data = prices.dropna(how='all')
+                else:
+                    continue
+                if not data.empty:
+                    self._store_history(symbol, period, data)
+                    frames[symbol] = data
+        
+        return {symbol: frames[symbol] for symbol in symbols if symbol in frames}
+    
     def calculate_technical_indicators(self, data):
         """Calculate various technical indicators"""
         if data is None or data.empty:
             return None
             
         df = data.copy()
+        close = df['Close'].to_numpy(dtype=np.float64)
         
         # Moving averages
-        df['SMA_20'] = ta.trend.sma_indicator(df['Close'], window=20)
-        df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-        df['EMA_12'] = ta.trend.ema_indicator(df['Close'], window=12)
-        df['EMA_26'] = ta.trend.ema_indicator(df['Close'], window=26)
+        df['SMA_20'] = sma_nb(close, 20)
+        df['SMA_50'] = sma_nb(close, 50)
+        df['EMA_12'] = ema_nb(close, 12)
+        df['EMA_26'] = ema_nb(close, 26)
         
         # MACD
-        df['MACD'] = ta.trend.macd_diff(df['Close'])
-        df['MACD_Signal'] = ta.trend.macd_signal(df['Close'])
+        macd_line = df['EMA_12'].to_numpy() - df['EMA_26'].to_numpy()
+        macd_signal = ema_nb(macd_line, 9)
+        df['MACD'] = macd_line - macd_signal
+        df['MACD_Signal'] = macd_signal
         
         # RSI
-        df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
+        df['RSI'] = rsi_nb(close, 14)
         
         # Bollinger Bands
-        df['BB_Upper'] = ta.volatility.bollinger_hband(df['Close'])
-        df['BB_Lower'] = ta.volatility.bollinger_lband(df['Close'])
-        df['BB_Middle'] = ta.volatility.bollinger_mavg(df['Close'])
+        bb_middle = sma_nb(close, 20)
+        bb_std = rolling_std_nb(close, 20)
+        df['BB_Upper'] = bb_middle + 2 * bb_std
+        df['BB_Lower'] = bb_middle - 2 * bb_std
+        df['BB_Middle'] = bb_middle
         
         # Volume indicators
-        df['Volume_SMA'] = ta.volume.volume_sma(df['Close'], df['Volume'])
+        df['Volume_SMA'] = sma_nb(df['Volume'].to_numpy(dtype=np.float64), 20)
         
-        # Stochastic
-        df['Stoch_K'] = ta.momentum.stoch(df['High'], df['Low'], df['Close'])
-        df['Stoch_D'] = ta.momentum.stoch_signal(df['High'], df['Low'], df['Close'])
+        # Stochastic (14-period %K, 3-period %D)
+        lowest_low = df['Low'].rolling(14, min_periods=14).min().to_numpy()
+        highest_high = df['High'].rolling(14, min_periods=14).max().to_numpy()
+        stoch_k = 100 * (close - lowest_low) / (highest_high - lowest_low)
+        df['Stoch_K'] = stoch_k
+        df['Stoch_D'] = sma_nb(stoch_k, 3)
         
         return df
     
-    def calculate_volatility(self, data):
-        """Calculate volatility metrics"""
+    def calculate_volatility(self, data, precomputed=None):
+        """Calculate volatility metrics, reusing _precompute output if given"""
         if data is None or data.empty:
             return None
             
-        returns = data['Close'].pct_change().dropna()
+        returns, max_drawdown, _ = precomputed or _precompute(data['Close'].to_numpy())
+        daily_volatility = np.std(returns, ddof=1)
+        var_95 = np.quantile(returns, 0.05) if returns.size else np.nan
         
         volatility_metrics = {
-            'daily_volatility': returns.std(),
-            'annualized_volatility': returns.std() * np.sqrt(252),
-            'max_drawdown': (data['Close'] / data['Close'].expanding().max() - 1).min(),
-            'var_95': returns.quantile(0.05),
-            'cvar_95': returns[returns <= returns.quantile(0.05)].mean()
+            'daily_volatility': daily_volatility,
+            'annualized_volatility': daily_volatility * np.sqrt(252),
+            'max_drawdown': max_drawdown,
+            'var_95': var_95,
+            'cvar_95': np.mean(returns[returns <= var_95])
         }
         
         return volatility_metrics
     
-    def calculate_risk_metrics(self, data):
-        """Calculate risk-adjusted return metrics"""
+    def calculate_risk_metrics(self, data, precomputed=None):
+        """Calculate risk-adjusted return metrics, reusing _precompute output if given"""
         if data is None or data.empty:
             return None
             
-        returns = data['Close'].pct_change().dropna()
-        excess_returns = returns - self.risk_free_rate / 252
+        close = data['Close'].to_numpy()
+        returns, max_drawdown, _ = precomputed or _precompute(close)
+        mean_excess = np.mean(returns) - self.risk_free_rate / 252
         
         risk_metrics = {
-            'sharpe_ratio': excess_returns.mean() / returns.std() * np.sqrt(252),
-            'sortino_ratio': excess_returns.mean() / returns[returns < 0].std() * np.sqrt(252),
-            'calmar_ratio': returns.mean() * 252 / abs((data['Close'] / data['Close'].expanding().max() - 1).min()),
-            'total_return': (data['Close'].iloc[-1] / data['Close'].iloc[0] - 1) * 100
+            'sharpe_ratio': mean_excess / np.std(returns, ddof=1) * np.sqrt(252),
+            'sortino_ratio': mean_excess / np.std(returns[returns < 0], ddof=1) * np.sqrt(252),
+            'calmar_ratio': np.mean(returns) * 252 / abs(max_drawdown),
+            'total_return': (close[-1] / close[0] - 1) * 100
         }
         
         return risk_metrics
@@ -98,31 +229,34 @@ class StockAnalyzer:
         """Generate buy/sell signals based on technical analysis"""
         if data is None or data.empty:
             return None
-            
+        
+        # Only the last two rows matter; plain numpy views skip pandas' .iloc machinery
+        tail = {col: data[col].to_numpy()[-2:] for col in
+                ('SMA_20', 'SMA_50', 'MACD', 'MACD_Signal', 'RSI', 'Close',
+                 'BB_Upper', 'BB_Lower', 'Stoch_K', 'Stoch_D')}
+        
         signals = {}
         
         # Moving average crossover
-        if data['SMA_20'].iloc[-1] > data['SMA_50'].iloc[-1] and \
-           data['SMA_20'].iloc[-2] <= data['SMA_50'].iloc[-2]:
+        sma_20, sma_50 = tail['SMA_20'], tail['SMA_50']
+        if sma_20[-1] > sma_50[-1] and sma_20[-2] <= sma_50[-2]:
             signals['MA_Crossover'] = 'BUY'
-        elif data['SMA_20'].iloc[-1] < data['SMA_50'].iloc[-1] and \
-             data['SMA_20'].iloc[-2] >= data['SMA_50'].iloc[-2]:
+        elif sma_20[-1] < sma_50[-1] and sma_20[-2] >= sma_50[-2]:
             signals['MA_Crossover'] = 'SELL'
         else:
             signals['MA_Crossover'] = 'HOLD'
         
         # MACD signals
-        if data['MACD'].iloc[-1] > data['MACD_Signal'].iloc[-1] and \
-           data['MACD'].iloc[-2] <= data['MACD_Signal'].iloc[-2]:
+        macd, macd_signal = tail['MACD'], tail['MACD_Signal']
+        if macd[-1] > macd_signal[-1] and macd[-2] <= macd_signal[-2]:
             signals['MACD'] = 'BUY'
-        elif data['MACD'].iloc[-1] < data['MACD_Signal'].iloc[-1] and \
-             data['MACD'].iloc[-2] >= data['MACD_Signal'].iloc[-2]:
+        elif macd[-1] < macd_signal[-1] and macd[-2] >= macd_signal[-2]:
             signals['MACD'] = 'SELL'
         else:
             signals['MACD'] = 'HOLD'
         
         # RSI signals
-        rsi_current = data['RSI'].iloc[-1]
+        rsi_current = tail['RSI'][-1]
         if rsi_current < 30:
             signals['RSI'] = 'BUY'
         elif rsi_current > 70:
@@ -131,9 +265,9 @@ class StockAnalyzer:
             signals['RSI'] = 'HOLD'
         
         # Bollinger Bands
-        close_current = data['Close'].iloc[-1]
-        bb_upper = data['BB_Upper'].iloc[-1]
-        bb_lower = data['BB_Lower'].iloc[-1]
+        close_current = tail['Close'][-1]
+        bb_upper = tail['BB_Upper'][-1]
+        bb_lower = tail['BB_Lower'][-1]
         
         if close_current <= bb_lower:
             signals['Bollinger_Bands'] = 'BUY'
@@ -143,8 +277,8 @@ class StockAnalyzer:
             signals['Bollinger_Bands'] = 'HOLD'
         
         # Stochastic signals
-        stoch_k = data['Stoch_K'].iloc[-1]
-        stoch_d = data['Stoch_D'].iloc[-1]
+        stoch_k = tail['Stoch_K'][-1]
+        stoch_d = tail['Stoch_D'][-1]
         
         if stoch_k < 20 and stoch_d < 20:
             signals['Stochastic'] = 'BUY'
@@ -160,9 +294,9 @@ class StockAnalyzer:
         if not signals:
             return 0, 'NEUTRAL'
         
-        buy_count = sum(1 for signal in signals.values() if signal == 'BUY')
-        sell_count = sum(1 for signal in signals.values() if signal == 'SELL')
-        hold_count = sum(1 for signal in signals.values() if signal == 'HOLD')
+        counts = Counter(signals.values())
+        buy_count = counts['BUY']
+        sell_count = counts['SELL']
         
         total_signals = len(signals)
         
@@ -178,6 +312,7 @@ class StockAnalyzer:
         
         return strength, recommendation
     
+    @_ttl_cached(lambda symbol, period="1y": f"analysis:{symbol}:{period}")
     def analyze_stock(self, symbol, period="1y"):
         """Complete stock analysis"""
         # Get data
@@ -188,39 +323,49 @@ class StockAnalyzer:
         # Calculate indicators
         data_with_indicators = self.calculate_technical_indicators(data)
         
+        return self.analyze_from_frame(data_with_indicators, symbol)
+    
+    def analyze_from_frame(self, data, symbol):
+        """Analysis of price data that already carries the technical indicators"""
+        # Returns and drawdown are shared by the volatility and risk metrics
+        close = data['Close'].to_numpy()
+        precomputed = _precompute(close)
+        
         # Calculate metrics
-        volatility = self.calculate_volatility(data)
-        risk_metrics = self.calculate_risk_metrics(data)
-        signals = self.generate_signals(data_with_indicators)
+        volatility = self.calculate_volatility(data, precomputed)
+        risk_metrics = self.calculate_risk_metrics(data, precomputed)
+        signals = self.generate_signals(data)
         signal_strength, recommendation = self.calculate_signal_strength(signals)
         
         # Current price info
-        current_price = data['Close'].iloc[-1]
-        price_change = data['Close'].iloc[-1] - data['Close'].iloc[-2]
-        price_change_pct = (price_change / data['Close'].iloc[-2]) * 100
+        current_price = close[-1]
+        price_change = close[-1] - close[-2]
+        price_change_pct = (price_change / close[-2]) * 100
         
         analysis_result = {
             'symbol': symbol,
             'current_price': round(current_price, 2),
             'price_change': round(price_change, 2),
             'price_change_pct': round(price_change_pct, 2),
-            'volume': data['Volume'].iloc[-1],
+            'volume': data['Volume'].to_numpy()[-1],
             'signals': signals,
             'signal_strength': round(signal_strength, 1),
             'recommendation': recommendation,
             'volatility': volatility,
             'risk_metrics': risk_metrics,
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'last_updated': datetime.now().isoformat(sep=' ', timespec='seconds'),
             'data_points': len(data)
         }
         
         return analysis_result
     
-    def get_market_sentiment(self, symbol):
-        """Get market sentiment indicators"""
+    @_ttl_cached(lambda symbol, info=None: f"sentiment:{symbol}")
+    def get_market_sentiment(self, symbol, info=None):
+        """Get market sentiment indicators, from an already fetched .info if given"""
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            if info is None:
+                import yfinance as yf
+                info = yf.Ticker(symbol, session=self.session).info
             
             sentiment_indicators = {
                 'market_cap': info.get('marketCap', 'N/A'),